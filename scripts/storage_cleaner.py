@@ -4,12 +4,15 @@ import os
 import re
 import shutil
 import tempfile
+import threading
 from abc import ABC, abstractmethod
 from argparse import ArgumentParser, _SubParsersAction
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
 from enum import Enum, auto
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 
 import boto3.session
@@ -19,9 +22,11 @@ import omegaconf
 import torch
 import wandb
 from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from cached_path import add_scheme_client, cached_path, set_cache_dir
 from cached_path.schemes import S3Client
 from google.api_core.exceptions import NotFound
+from google.cloud.storage import transfer_manager
 from omegaconf import OmegaConf as om
 from rich.progress import track
 
@@ -38,7 +43,22 @@ log = logging.getLogger(__name__)
 
 
 CONFIG_YAML: str = "config.yaml"
-DEFAULT_DELETE_MAX_ARCHIVE_SIZE: float = 5 * 1024 * 1024 * 1024  # 5GB
+DEFAULT_DELETE_MAX_ARCHIVE_SIZE: int = 5 * 1024 * 1024 * 1024  # 5GB
+DEFAULT_DELETE_MAX_WORKERS: int = 1
+DEFAULT_UNSHARD_MAX_WORKERS: int = 1
+MAX_TRANSFER_WORKERS: int = 16
+S3_MAX_CONCURRENCY_PER_TRANSFER: int = 4
+S3_MULTIPART_CHUNK_SIZE: int = 64 * 1024 * 1024  # 64MB
+
+URL_REGEX: re.Pattern = re.compile(r"[a-z0-9]+://.*")
+CHECKPOINT_DIR_ENTRY_REGEX: re.Pattern = re.compile(r"step\d+(-unsharded)?")
+NONTRIVIAL_CHECKPOINT_DIR_ENTRY_REGEX: re.Pattern = re.compile(r"step[1-9]\d*(-unsharded)?")
+CHECKPOINT_DIR_NAME_REGEX: re.Pattern = re.compile(r"step\d+(-unsharded)?$")
+SHARDED_CHECKPOINT_DIR_NAME_REGEX: re.Pattern = re.compile(r"step\d+$")
+CHECKPOINT_NUMBER_REGEX: re.Pattern = re.compile(r"step(\d+)$")
+
+# Held by the transfer that is showing a progress bar
+_progress_display_lock = threading.Lock()
 
 
 class CleaningOperations(Enum):
@@ -54,6 +74,21 @@ class StorageType(util.StrEnum):
     R2 = "r2"
 
 
+def _wait_for_futures(futures: List[Future], description: str):
+    # Rich only allows one live display at a time, so when transfers run concurrently (e.g. when
+    # unsharding checkpoints concurrently) only one of them shows a progress bar.
+    if not _progress_display_lock.acquire(blocking=False):
+        for future in as_completed(futures):
+            future.result()
+        return
+
+    try:
+        for future in track(as_completed(futures), total=len(futures), description=description):
+            future.result()
+    finally:
+        _progress_display_lock.release()
+
+
 class StorageAdapter(ABC):
     @abstractmethod
     def list_entries(self, directory: str, max_file_size: Optional[int] = None) -> List[str]:
@@ -111,7 +146,7 @@ class StorageAdapter(ABC):
 
     @staticmethod
     def _is_url(path: str) -> bool:
-        return re.match(r"[a-z0-9]+://.*", path) is not None
+        return URL_REGEX.match(path) is not None
 
     @staticmethod
     def get_storage_type_for_path(path: str) -> StorageType:
@@ -129,21 +164,53 @@ class StorageAdapter(ABC):
         return StorageType.LOCAL_FS
 
 
+def _copy_file(src: str, dest: str) -> str:
+    """
+    Copies the file at `src` to `dest` along with its metadata, like `shutil.copy2`. Where supported,
+    the data is copied within the kernel using `os.copy_file_range`, which also lets copy-on-write
+    file systems share data between the files rather than duplicating it.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as src_file, open(dest, "wb") as dest_file:
+                remaining_bytes = os.fstat(src_file.fileno()).st_size
+                while remaining_bytes > 0:
+                    copied_bytes = os.copy_file_range(src_file.fileno(), dest_file.fileno(), remaining_bytes)
+                    if copied_bytes == 0:
+                        break
+                    remaining_bytes -= copied_bytes
+
+            if remaining_bytes == 0:
+                shutil.copystat(src, dest)
+                return dest
+        except OSError as e:
+            log.debug("Kernel copy of %s to %s failed, falling back to regular copy: %s", src, dest, e)
+
+    return shutil.copy2(src, dest)
+
+
 class LocalFileSystemAdapter(StorageAdapter):
     def __init__(self) -> None:
         super().__init__()
         self._temp_files: List[tempfile._TemporaryFileWrapper[bytes]] = []
         self._temp_dirs: List[tempfile.TemporaryDirectory] = []
-        self._archive_extensions: List[str] = [
+        self._archive_extensions: Tuple[str, ...] = tuple(
             extension.lower() for _, extensions, _ in shutil.get_unpack_formats() for extension in extensions
-        ]
+        )
 
     def __del__(self):
+        self.delete_temp_files()
+
+    def delete_temp_files(self):
+        """Deletes all the temporary files and directories created by this adapter."""
         for temp_file in self._temp_files:
             temp_file.close()
         for temp_dir in self._temp_dirs:
             temp_dir.cleanup()
 
+        self._temp_files = []
+        self._temp_dirs = []
+
     def create_temp_file(self, suffix: Optional[str] = None) -> str:
         temp_file = tempfile.NamedTemporaryFile(suffix=suffix)
         self._temp_files.append(temp_file)
@@ -156,7 +223,7 @@ class LocalFileSystemAdapter(StorageAdapter):
 
     def has_supported_archive_extension(self, path: PathOrStr) -> bool:
         filename = Path(path).name.lower()
-        return any(filename.endswith(extension) for extension in self._archive_extensions)
+        return filename.endswith(self._archive_extensions)
 
     def _list_entries(
         self, directory: PathOrStr, include_files: bool = True, max_file_size: Optional[int] = None
@@ -165,14 +232,16 @@ class LocalFileSystemAdapter(StorageAdapter):
         if not dir_obj.is_dir():
             raise ValueError(f"{directory} is not an existing directory")
 
-        return [
-            entry.name
-            for entry in dir_obj.iterdir()
-            if (
-                (include_files or not entry.is_file())
-                and (not entry.is_file() or max_file_size is None or self._get_file_size(entry) <= max_file_size)
-            )
-        ]
+        # Directory entries from scandir cache their file type and stat info, avoiding repeated stat calls
+        with os.scandir(dir_obj) as dir_entries:
+            return [
+                entry.name
+                for entry in dir_entries
+                if (
+                    (include_files or not entry.is_file())
+                    and (not entry.is_file() or max_file_size is None or entry.stat().st_size <= max_file_size)
+                )
+            ]
 
     def list_entries(self, directory: str, max_file_size: Optional[int] = None) -> List[str]:
         return self._list_entries(directory, max_file_size=max_file_size)
@@ -215,13 +284,37 @@ class LocalFileSystemAdapter(StorageAdapter):
             raise ValueError(f"No entry exists at path {directory_path}")
 
         if directory_path_obj.is_dir():
-            shutil.copytree(directory_path, str(local_dest_folder), dirs_exist_ok=True)
+            # Like shutil.copytree, but the files are copied concurrently so that the disk has several requests
+            # in flight at a time. Directory metadata is copied only once all the files have been copied, since
+            # it may make directories read-only and copying files updates directory modification times.
+            src_and_dest_dirs: List[Tuple[str, str]] = []
+            with ThreadPoolExecutor(max_workers=MAX_TRANSFER_WORKERS) as executor:
+                futures: List[Future] = []
+                for src_dir, _, file_names in os.walk(directory_path, followlinks=True):
+                    dest_dir = os.path.join(str(local_dest_folder), os.path.relpath(src_dir, directory_path))
+                    os.makedirs(dest_dir, exist_ok=True)
+                    src_and_dest_dirs.append((src_dir, dest_dir))
+
+                    for file_name in file_names:
+                        futures.append(
+                            executor.submit(
+                                _copy_file, os.path.join(src_dir, file_name), os.path.join(dest_dir, file_name)
+                            )
+                        )
+
+                for future in futures:
+                    future.result()
+
+            # Subdirectories are handled before their parents, so that parents can be made read-only
+            for src_dir, dest_dir in reversed(src_and_dest_dirs):
+                shutil.copystat(src_dir, dest_dir)
         else:
             raise RuntimeError(f"Unexpected type of path {directory_path}")
 
     def upload(self, local_src: PathOrStr, dest_path: str):
         local_src_obj = Path(local_src)
         if local_src_obj.is_file():
+            Path(dest_path).parent.mkdir(parents=True, exist_ok=True)
             shutil.copy(str(local_src_obj), dest_path)
         elif local_src_obj.is_dir():
             self.download_folder(str(local_src), dest_path)
@@ -229,6 +322,15 @@ class LocalFileSystemAdapter(StorageAdapter):
             raise RuntimeError(f"Unexpected type of local src path {local_src}")
 
 
+@lru_cache(maxsize=4096)
+def _get_bucket_name_and_key(path: str) -> Tuple[str, str]:
+    # Cloud paths are parsed repeatedly during a single operation, so the results are cached
+    parsed_path = urlparse(path)
+    bucket_name = parsed_path.netloc
+    key = parsed_path.path.lstrip("/")
+    return bucket_name, key
+
+
 class GoogleCloudStorageAdapter(StorageAdapter):
     def __init__(self) -> None:
         super().__init__()
@@ -250,19 +352,14 @@ class GoogleCloudStorageAdapter(StorageAdapter):
 
         return self._gcs_client
 
-    @staticmethod
-    def _get_bucket_name_and_key(path: str) -> Tuple[str, str]:
-        parsed_path = urlparse(path)
-        bucket_name = parsed_path.netloc
-        key = parsed_path.path.lstrip("/")
-        return bucket_name, key
-
     @staticmethod
     def _get_path(bucket_name: str, key: str) -> str:
         return f"gs://{bucket_name}/{key}"
 
     def _get_blob_size(self, blob: gcs.Blob) -> int:
-        blob.reload()
+        # Listed and fetched blobs usually have their size populated already, so we avoid an extra request
+        if blob.size is None:
+            blob.reload()
         if blob.size is None:
             raise ValueError(f"Failed to get size for blob: {blob.name}")
         return blob.size
@@ -295,8 +392,8 @@ class GoogleCloudStorageAdapter(StorageAdapter):
         max_file_size: Optional[int] = None,
     ) -> List[str]:
         bucket = self.gcs_client.bucket(bucket_name)
-        # Using delimiter causes result to have directory-like structure
-        blobs = bucket.list_blobs(prefix=key, delimiter="/")
+        # Using delimiter causes result to have directory-like structure. Only the fields we need are requested.
+        blobs = bucket.list_blobs(prefix=key, delimiter="/", fields="items(name,size),prefixes,nextPageToken")
 
         entries: List[str] = []
         for blob in blobs:
@@ -325,7 +422,7 @@ class GoogleCloudStorageAdapter(StorageAdapter):
     def _list_entries(
         self, directory: str, include_files: bool = True, max_file_size: Optional[int] = None
     ) -> List[str]:
-        bucket_name, key = self._get_bucket_name_and_key(directory)
+        bucket_name, key = _get_bucket_name_and_key(directory)
 
         if not self._is_dir(bucket_name, key):
             raise ValueError(f"{directory} is not an existing directory")
@@ -342,21 +439,30 @@ class GoogleCloudStorageAdapter(StorageAdapter):
         return self._list_entries(directory, include_files=False)
 
     def delete_path(self, path: str):
-        bucket_name, key = self._get_bucket_name_and_key(path)
+        bucket_name, key = _get_bucket_name_and_key(path)
 
         bucket = self.gcs_client.bucket(bucket_name)
-        # Not using delimiter causes result to not have directory-like structure (all blobs returned)
-        blobs = list(bucket.list_blobs(prefix=key))
+        # Not using delimiter causes result to not have directory-like structure (all blobs returned).
+        # Blobs are deleted one page at a time rather than after listing everything.
+        blob_pages = bucket.list_blobs(prefix=key, page_size=1000).pages
+
+        log.info("Starting to delete blobs at %s", path)
 
-        bucket.delete_blobs(blobs)
+        # GCS batch requests are limited to 100 calls
+        max_delete_batch_size: int = 100
+        for blob_page in blob_pages:
+            blobs: List[gcs.Blob] = list(blob_page)
+            for i in range(0, len(blobs), max_delete_batch_size):
+                with self.gcs_client.batch():
+                    bucket.delete_blobs(blobs[i : i + max_delete_batch_size])
 
     def is_file(self, path: str) -> bool:
-        bucket_name, key = self._get_bucket_name_and_key(path)
+        bucket_name, key = _get_bucket_name_and_key(path)
 
         return self._is_file(bucket_name, key)
 
     def get_file_size(self, path: str) -> int:
-        bucket_name, key = self._get_bucket_name_and_key(path)
+        bucket_name, key = _get_bucket_name_and_key(path)
 
         return self._get_size(bucket_name, key)
 
@@ -369,35 +475,83 @@ class GoogleCloudStorageAdapter(StorageAdapter):
         return not self._is_file(bucket_name, key) and len(blobs) > 0
 
     def is_dir(self, path: str) -> bool:
-        bucket_name, key = self._get_bucket_name_and_key(path)
+        bucket_name, key = _get_bucket_name_and_key(path)
 
         return self._is_dir(bucket_name, key)
 
+    @staticmethod
+    def _download_blob(blob: gcs.Blob, local_filepath: str):
+        Path(local_filepath).parent.mkdir(parents=True, exist_ok=True)
+        blob.download_to_filename(local_filepath)
+
     def download_folder(self, directory_path: str, local_dest_folder: PathOrStr):
-        bucket_name, key = self._get_bucket_name_and_key(directory_path)
+        bucket_name, key = _get_bucket_name_and_key(directory_path)
         bucket = self.gcs_client.bucket(bucket_name)
 
         if self._is_dir(bucket_name, key):
             blobs: List[gcs.Blob] = list(bucket.list_blobs(prefix=key))
 
-            for blob in track(blobs, description=f"Downloading files at {directory_path}"):
-                if not blob.name:
-                    raise NotImplementedError()
-                blob_path: str = blob.name
-                blob_local_dest = blob_path.replace(key.rstrip("/"), str(local_dest_folder).rstrip("/"))
-                blob.download_to_filename(blob_local_dest)
+            with ThreadPoolExecutor(max_workers=MAX_TRANSFER_WORKERS) as executor:
+                futures: List[Future] = []
+                for blob in blobs:
+                    if not blob.name:
+                        raise NotImplementedError()
+                    blob_path: str = blob.name
+                    blob_local_dest = str(local_dest_folder).rstrip("/") + blob_path.removeprefix(key.rstrip("/"))
+
+                    futures.append(executor.submit(self._download_blob, blob, blob_local_dest))
+
+                _wait_for_futures(futures, description=f"Downloading files at {directory_path}")
         else:
             raise ValueError(f"Path {directory_path} is not a valid directory")
 
     def upload(self, local_src: PathOrStr, dest_path: str):
-        raise NotImplementedError()
+        bucket_name, key = _get_bucket_name_and_key(dest_path)
+        bucket = self.gcs_client.bucket(bucket_name)
+
+        if self.local_fs_adapter.is_file(str(local_src)):
+            bucket.blob(key).upload_from_filename(str(local_src))
+
+        elif self.local_fs_adapter.is_dir(str(local_src)):
+            local_src = Path(local_src)
+
+            filenames = [
+                str(file_local_path.relative_to(local_src))
+                for file_local_path in local_src.rglob("*")
+                if file_local_path.is_file()
+            ]
+            log.info("Uploading %d files to %s", len(filenames), dest_path)
+            transfer_manager.upload_many_from_filenames(
+                bucket,
+                filenames,
+                source_directory=str(local_src),
+                blob_name_prefix=f"{key.rstrip('/')}/" if key else "",
+                skip_if_exists=True,
+                raise_exception=True,
+                worker_type=transfer_manager.THREAD,
+                max_workers=MAX_TRANSFER_WORKERS,
+            )
+
+        else:
+            raise ValueError(f"Local source {local_src} does not correspond to a valid file or directory")
 
 
 class S3StorageAdapter(StorageAdapter):
     def __init__(self, storage_type: StorageType):
         super().__init__()
         self._storage_type = storage_type
-        self._s3_client = util._get_s3_client(str(storage_type))
+        self._s3_client: Optional[Any] = None
+        # Checkpoint files are often several GBs, so larger parts are used to reduce the number of requests
+        self._transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=S3_MULTIPART_CHUNK_SIZE,
+            max_concurrency=S3_MAX_CONCURRENCY_PER_TRANSFER,
+        )
+
+        # Results of file and directory checks, keyed by (bucket name, key). These are cleared
+        # whenever objects are uploaded or deleted, since that may change the results.
+        self._is_file_cache: Dict[Tuple[str, str], bool] = {}
+        self._is_dir_cache: Dict[Tuple[str, str], bool] = {}
 
         self._local_fs_adapter: Optional[LocalFileSystemAdapter] = None
         self._temp_dirs: List[tempfile.TemporaryDirectory] = []
@@ -409,12 +563,24 @@ class S3StorageAdapter(StorageAdapter):
 
         return self._local_fs_adapter
 
-    @staticmethod
-    def _get_bucket_name_and_key(path: str) -> Tuple[str, str]:
-        parsed_path = urlparse(path)
-        bucket_name = parsed_path.netloc
-        key = parsed_path.path.lstrip("/")
-        return bucket_name, key
+    @property
+    def s3_client(self):
+        if self._s3_client is None:
+            # Same as `util._get_s3_client`, but the connection pool is big enough for the concurrent transfers
+            # of a directory. The default pool of 10 connections causes connections to be discarded and remade.
+            scheme = str(self._storage_type)
+            session = boto3.session.Session(profile_name=util._get_s3_profile_name(scheme))
+            self._s3_client = session.client(
+                "s3",
+                endpoint_url=util._get_s3_endpoint_url(scheme),
+                config=Config(
+                    retries={"max_attempts": 10, "mode": "standard"},
+                    max_pool_connections=MAX_TRANSFER_WORKERS * S3_MAX_CONCURRENCY_PER_TRANSFER,
+                ),
+                use_ssl=not int(os.environ.get("OLMO_NO_SSL", "0")),
+            )
+
+        return self._s3_client
 
     def _get_path(self, bucket_name: str, key: str) -> str:
         scheme: str
@@ -431,11 +597,19 @@ class S3StorageAdapter(StorageAdapter):
         if not self._is_file(bucket_name, key):
             raise ValueError(f"Provided path does not correspond to a file: {self._get_path(bucket_name, key)}")
 
-        head_response: Dict[str, Any] = self._s3_client.head_object(Bucket=bucket_name, Key=key)
+        head_response: Dict[str, Any] = self.s3_client.head_object(Bucket=bucket_name, Key=key)
         if "ContentLength" not in head_response:
             raise RuntimeError(f"Failed to get size for file: {self._get_path(bucket_name, key)}")
         return head_response["ContentLength"]
 
+    def _list_objects_pages(
+        self, bucket_name: str, key: str, delimiter: Optional[str] = None
+    ) -> Iterable[Dict[str, Any]]:
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        if delimiter is not None:
+            return paginator.paginate(Bucket=bucket_name, Prefix=key, Delimiter=delimiter)
+        return paginator.paginate(Bucket=bucket_name, Prefix=key)
+
     def _get_directory_entries(
         self,
         bucket_name: str,
@@ -443,36 +617,35 @@ class S3StorageAdapter(StorageAdapter):
         include_files: bool = True,
         max_file_size: Optional[int] = None,
     ) -> List[str]:
-        response: Dict[str, Any] = self._s3_client.list_objects_v2(Bucket=bucket_name, Prefix=key, Delimiter="/")
-
         entries: List[str] = []
 
-        if include_files:
-            objects_metadata: List[Dict[str, Any]] = response.get("Contents", [])
-            for object_metadata in objects_metadata:
-                object_name = object_metadata["Key"]
-
-                size: int = object_metadata["Size"]
-                if max_file_size is not None and size > max_file_size:
-                    log.info(
-                        "Object %s has size %.2fGiB exceeding max file size %.2fGiB, skipping.",
-                        object_name,
-                        size / (1024 * 1024 * 1024),
-                        max_file_size / (1024 * 1024 * 1024),
-                    )
-                    continue
+        for response in self._list_objects_pages(bucket_name, key, delimiter="/"):
+            if include_files:
+                objects_metadata: List[Dict[str, Any]] = response.get("Contents", [])
+                for object_metadata in objects_metadata:
+                    object_name = object_metadata["Key"]
+
+                    size: int = object_metadata["Size"]
+                    if max_file_size is not None and size > max_file_size:
+                        log.info(
+                            "Object %s has size %.2fGiB exceeding max file size %.2fGiB, skipping.",
+                            object_name,
+                            size / (1024 * 1024 * 1024),
+                            max_file_size / (1024 * 1024 * 1024),
+                        )
+                        continue
 
-                entries.append(object_name)
+                    entries.append(object_name)
 
-        directories_metadata: List[Dict[str, str]] = response.get("CommonPrefixes", [])
-        entries += [directory_metadata["Prefix"] for directory_metadata in directories_metadata]
+            directories_metadata: List[Dict[str, str]] = response.get("CommonPrefixes", [])
+            entries += [directory_metadata["Prefix"] for directory_metadata in directories_metadata]
 
         return [entry.removeprefix(key) for entry in entries]
 
     def _list_entries(
         self, directory: str, include_files: bool = True, max_file_size: Optional[int] = None
     ) -> List[str]:
-        bucket_name, key = self._get_bucket_name_and_key(directory)
+        bucket_name, key = _get_bucket_name_and_key(directory)
 
         if not self._is_dir(bucket_name, key):
             raise ValueError(f"{directory} is not an existing directory")
@@ -489,24 +662,28 @@ class S3StorageAdapter(StorageAdapter):
         return self._list_entries(directory, include_files=False)
 
     def delete_path(self, path: str):
-        bucket_name, key = self._get_bucket_name_and_key(path)
-
-        response: Dict[str, Any] = self._s3_client.list_objects_v2(Bucket=bucket_name, Prefix=key)
+        bucket_name, key = _get_bucket_name_and_key(path)
 
-        objects_metadata: List[Dict[str, Any]] = response.get("Contents", [])
-        object_keys_to_delete: List[str] = [object_metadata["Key"] for object_metadata in objects_metadata]
+        log.info("Starting to delete objects at %s", path)
 
-        log.info("Starting to delete %d objects at %s", len(object_keys_to_delete), path)
+        # A listed page has at most 1000 objects, which is also the most that can be deleted in one request
+        for response in self._list_objects_pages(bucket_name, key):
+            objects_metadata: List[Dict[str, Any]] = response.get("Contents", [])
+            object_keys_to_delete: List[str] = [object_metadata["Key"] for object_metadata in objects_metadata]
+            if len(object_keys_to_delete) > 0:
+                self._delete_objects(bucket_name, object_keys_to_delete, path)
 
+    def _delete_objects(self, bucket_name: str, object_keys_to_delete: List[str], path: str):
         max_delete_batch_size: int = 1000
         for i in range(0, len(object_keys_to_delete), max_delete_batch_size):
-            delete_batch_keys = [
-                {"Key": object_key} for object_key in object_keys_to_delete[i : i + max_delete_batch_size]
-            ]
+            delete_batch_keys: List[str] = object_keys_to_delete[i : i + max_delete_batch_size]
 
-            delete_response: Dict[str, Any] = self._s3_client.delete_objects(
-                Bucket=bucket_name, Delete={"Objects": delete_batch_keys}
+            # Quiet mode is disabled so that the response lists deleted keys, which we verify below
+            delete_response: Dict[str, Any] = self.s3_client.delete_objects(
+                Bucket=bucket_name,
+                Delete={"Objects": [{"Key": object_key} for object_key in delete_batch_keys], "Quiet": False},
             )
+            self._clear_path_caches()
 
             errors: List[Dict[str, Any]] = delete_response.get("Errors", [])
             if len(errors) > 0:
@@ -521,7 +698,7 @@ class S3StorageAdapter(StorageAdapter):
                 raise RuntimeError(f"Error occurred during deletion at {path}")
 
             deleted_object_keys = [deleted_object["Key"] for deleted_object in delete_response.get("Deleted", [])]
-            delete_batch_keys_set = set(object_keys_to_delete[i : i + max_delete_batch_size])
+            delete_batch_keys_set = set(delete_batch_keys)
             deleted_object_keys_set = set(deleted_object_keys)
             unrequested_deleted_keys = deleted_object_keys_set.difference(delete_batch_keys_set)
             if len(unrequested_deleted_keys) > 0:
@@ -530,12 +707,24 @@ class S3StorageAdapter(StorageAdapter):
             if len(undeleted_keys) > 0:
                 raise RuntimeError(f"The following keys failed to be deleted: {undeleted_keys}")
 
+    def _clear_path_caches(self):
+        self._is_file_cache.clear()
+        self._is_dir_cache.clear()
+
     def _is_file(self, bucket_name: str, key: str) -> bool:
         if len(key) == 0:
             return False
 
+        is_file = self._is_file_cache.get((bucket_name, key))
+        if is_file is None:
+            is_file = self._object_exists(bucket_name, key)
+            self._is_file_cache[(bucket_name, key)] = is_file
+
+        return is_file
+
+    def _object_exists(self, bucket_name: str, key: str) -> bool:
         try:
-            self._s3_client.head_object(Bucket=bucket_name, Key=key)
+            self.s3_client.head_object(Bucket=bucket_name, Key=key)
             return True
         except boto_exceptions.ClientError as e:
             if int(e.response["Error"]["Code"]) == 404:
@@ -544,64 +733,95 @@ class S3StorageAdapter(StorageAdapter):
             raise e
 
     def is_file(self, path: str) -> bool:
-        bucket_name, key = self._get_bucket_name_and_key(path)
+        bucket_name, key = _get_bucket_name_and_key(path)
 
         return self._is_file(bucket_name, key)
 
     def get_file_size(self, path: str) -> int:
-        bucket_name, key = self._get_bucket_name_and_key(path)
+        bucket_name, key = _get_bucket_name_and_key(path)
 
         return self._get_size(bucket_name, key)
 
     def _is_dir(self, bucket_name: str, key: str) -> bool:
         key = f"{key}/" if not key.endswith("/") else key
-        if self._is_file(bucket_name, key):
-            return False
 
-        response = self._s3_client.list_objects_v2(Bucket=bucket_name, Prefix=key, MaxKeys=1)
+        is_dir = self._is_dir_cache.get((bucket_name, key))
+        if is_dir is None:
+            is_dir = not self._is_file(bucket_name, key) and self._has_objects(bucket_name, key)
+            self._is_dir_cache[(bucket_name, key)] = is_dir
+
+        return is_dir
+
+    def _has_objects(self, bucket_name: str, key: str) -> bool:
+        response = self.s3_client.list_objects_v2(Bucket=bucket_name, Prefix=key, MaxKeys=1)
         return "Contents" in response
 
     def is_dir(self, path: str) -> bool:
-        bucket_name, key = self._get_bucket_name_and_key(path)
+        bucket_name, key = _get_bucket_name_and_key(path)
 
         return self._is_dir(bucket_name, key)
 
     def download_folder(self, directory_path: str, local_dest_folder: PathOrStr):
-        bucket_name, key = self._get_bucket_name_and_key(directory_path)
+        bucket_name, key = _get_bucket_name_and_key(directory_path)
 
         if self._is_dir(bucket_name, key):
-            response = self._s3_client.list_objects_v2(Bucket=bucket_name, Prefix=key)
-            objects_metadata: List[Dict[str, Any]] = response["Contents"]
-            for object_metadata in track(objects_metadata, description=f"Downloading files at {directory_path}"):
-                object_key: str = object_metadata["Key"]
-                object_local_dest = object_key.replace(key.rstrip("/"), str(local_dest_folder).rstrip("/"))
+            objects_metadata: List[Dict[str, Any]] = [
+                object_metadata
+                for response in self._list_objects_pages(bucket_name, key)
+                for object_metadata in response.get("Contents", [])
+            ]
+            with ThreadPoolExecutor(max_workers=MAX_TRANSFER_WORKERS) as executor:
+                futures: List[Future] = []
+                for object_metadata in objects_metadata:
+                    object_key: str = object_metadata["Key"]
+                    object_local_dest = str(local_dest_folder).rstrip("/") + object_key.removeprefix(
+                        key.rstrip("/")
+                    )
+
+                    futures.append(
+                        executor.submit(self._download_file, bucket_name, object_key, object_local_dest)
+                    )
 
-                self._s3_client.download_file(bucket_name, object_key, object_local_dest)
+                _wait_for_futures(futures, description=f"Downloading files at {directory_path}")
         else:
             raise ValueError(f"Path {directory_path} is not a valid directory")
 
+    def _download_file(self, bucket_name: str, key: str, local_filepath: str):
+        Path(local_filepath).parent.mkdir(parents=True, exist_ok=True)
+        self.s3_client.download_file(bucket_name, key, local_filepath, Config=self._transfer_config)
+
     def _upload_file(self, local_filepath: str, bucket_name: str, key: str):
-        transfer_config = TransferConfig(max_concurrency=4)
-        self._s3_client.upload_file(local_filepath, bucket_name, key, Config=transfer_config)
+        self.s3_client.upload_file(local_filepath, bucket_name, key, Config=self._transfer_config)
+        self._clear_path_caches()
+
+    def _upload_file_if_missing(self, local_filepath: str, bucket_name: str, key: str):
+        if not self._is_file(bucket_name, key):
+            self._upload_file(local_filepath, bucket_name, key)
 
     def upload(self, local_src: PathOrStr, dest_path: str):
         if self.local_fs_adapter.is_file(str(local_src)):
-            bucket_name, key = self._get_bucket_name_and_key(dest_path)
+            bucket_name, key = _get_bucket_name_and_key(dest_path)
             self._upload_file(str(local_src), bucket_name, key)
 
         elif self.local_fs_adapter.is_dir(str(local_src)):
             local_src = Path(local_src)
 
-            local_file_paths = list(local_src.rglob("*"))
-            for file_local_path in track(local_file_paths, description=f"Uploading to {dest_path}"):
-                if file_local_path.is_dir():
-                    continue
+            local_file_paths = [
+                file_local_path for file_local_path in local_src.rglob("*") if file_local_path.is_file()
+            ]
+            with ThreadPoolExecutor(max_workers=MAX_TRANSFER_WORKERS) as executor:
+                futures: List[Future] = []
+                for file_local_path in local_file_paths:
+                    file_dest_path = dest_path.rstrip("/") + str(file_local_path).removeprefix(
+                        str(local_src).rstrip("/")
+                    )
+                    bucket_name, key = _get_bucket_name_and_key(file_dest_path)
 
-                file_dest_path = str(file_local_path).replace(str(local_src).rstrip("/"), dest_path.rstrip("/"))
-                bucket_name, key = self._get_bucket_name_and_key(file_dest_path)
+                    futures.append(
+                        executor.submit(self._upload_file_if_missing, str(file_local_path), bucket_name, key)
+                    )
 
-                if not self._is_file(bucket_name, key):
-                    self._upload_file(str(file_local_path), bucket_name, key)
+                _wait_for_futures(futures, description=f"Uploading to {dest_path}")
 
         else:
             raise ValueError(f"Local source {local_src} does not correspond to a valid file or directory")
@@ -618,6 +838,7 @@ class DeleteBadRunsConfig(StorageCleanerConfig):
     should_check_is_run: bool
     ignore_non_runs: bool
     max_archive_size: Optional[int]
+    max_workers: int
 
 
 @dataclass
@@ -625,6 +846,7 @@ class UnshardCheckpointsConfig(StorageCleanerConfig):
     latest_checkpoint_only: bool
     delete_sharded_checkpoints: bool
     checkpoint_num: Optional[int]
+    max_workers: int
 
 
 @dataclass
@@ -634,17 +856,23 @@ class MoveRunConfig(StorageCleanerConfig):
     store_archived: bool
 
 
+@lru_cache(maxsize=None)
+def _get_storage_adapter(storage_type: StorageType) -> StorageAdapter:
+    # Adapters hold their own clients, which are expensive to create, so one adapter is shared per storage type
+    return StorageAdapter.create_storage_adapter(storage_type)
+
+
 def _get_storage_adapter_for_path(path: str) -> StorageAdapter:
     storage_type = StorageAdapter.get_storage_type_for_path(path)
-    return StorageAdapter.create_storage_adapter(storage_type)
+    return _get_storage_adapter(storage_type)
 
 
 def _contains_checkpoint_dir(dir_entries: List[str]) -> bool:
-    return any(re.match(r"step\d+(-unsharded)?", entry) is not None for entry in dir_entries)
+    return any(CHECKPOINT_DIR_ENTRY_REGEX.match(entry) is not None for entry in dir_entries)
 
 
 def _contains_nontrivial_checkpoint_dir(dir_entries: List[str]) -> bool:
-    return any(re.match(r"step[1-9]\d*(-unsharded)?", entry) is not None for entry in dir_entries)
+    return any(NONTRIVIAL_CHECKPOINT_DIR_ENTRY_REGEX.match(entry) is not None for entry in dir_entries)
 
 
 def _is_run(directory: str, run_entries: Optional[List[str]] = None) -> bool:
@@ -683,18 +911,19 @@ def _is_archive(path: str, storage: StorageAdapter) -> bool:
 
 
 def _format_dir_or_archive_path(storage: StorageAdapter, path: str) -> str:
-    if storage.is_dir(path):
-        return f"{path}/" if not path.endswith("/") else path
-
+    # The archive check is done first since it only needs a storage lookup for paths with archive extensions
     if _is_archive(path, storage):
         return path
 
+    if storage.is_dir(path):
+        return f"{path}/" if not path.endswith("/") else path
+
     raise ValueError(f"Path does not correspond to a directory or archive file: {path}")
 
 
-def _unarchive_if_archive(dir_or_archive: str, storage: StorageAdapter) -> str:
+def _unarchive_if_archive(dir_or_archive: str, storage: StorageAdapter, temp_dir: Optional[str] = None) -> str:
     if _is_archive(dir_or_archive, storage):
-        unarchived_dir = cached_path(dir_or_archive, extract_archive=True)
+        unarchived_dir = cached_path(dir_or_archive, cache_dir=temp_dir, extract_archive=True)
         assert unarchived_dir != Path(dir_or_archive)
 
         # The unarchived file could have a redundant top-level directory. If the top-level
@@ -716,7 +945,7 @@ def _unarchive_if_archive(dir_or_archive: str, storage: StorageAdapter) -> str:
 
 def _should_delete_run(storage: StorageAdapter, run_dir_or_archive: str, config: DeleteBadRunsConfig) -> bool:
     # Do not delete archive files that are bigger than the configured max
-    if config.max_archive_size is not None and storage.is_file(run_dir_or_archive):
+    if config.max_archive_size is not None and _is_archive(run_dir_or_archive, storage):
         file_size = storage.get_file_size(run_dir_or_archive)
         if file_size > config.max_archive_size:
             log.info(
@@ -727,60 +956,99 @@ def _should_delete_run(storage: StorageAdapter, run_dir_or_archive: str, config:
             )
             return False
 
-    run_dir = _unarchive_if_archive(run_dir_or_archive, storage)
+    run_dir = _unarchive_if_archive(run_dir_or_archive, storage, temp_dir=config.temp_dir)
     run_dir_storage = _get_storage_adapter_for_path(run_dir)
 
     run_entries = run_dir_storage.list_entries(run_dir)
-    if config.should_check_is_run and not _is_run(run_dir, run_entries=run_entries):
-        _verify_non_run_deletion(run_dir_or_archive, run_entries, config)
-        return False
 
-    # Runs with non-trivial checkpoints are considered good
+    # Runs with non-trivial checkpoints are considered good. This is checked before verifying that
+    # the directory is a run, since containing a checkpoint directory already makes it a run.
     if _contains_nontrivial_checkpoint_dir(run_entries):
         log.info("Run directory or archive %s contains a non-trivial checkpoint directory", run_dir_or_archive)
         return False
 
+    if config.should_check_is_run and not _is_run(run_dir, run_entries=run_entries):
+        _verify_non_run_deletion(run_dir_or_archive, run_entries, config)
+        return False
+
     return True
 
 
-def _delete_if_bad_run(storage: StorageAdapter, run_path: str, config: DeleteBadRunsConfig):
-    run_dir_or_archive = _format_dir_or_archive_path(storage, run_path)
+def _get_bad_run_path(run_path: str, config: DeleteBadRunsConfig) -> Optional[str]:
+    storage: StorageAdapter = _get_storage_adapter_for_path(run_path)
+    log.info("Starting to check if run %s should be deleted", run_path)
+
+    # Each run gets its own temp dir, so that runs checked concurrently do not delete each other's files
+    run_config = replace(config, temp_dir=tempfile.mkdtemp(dir=config.temp_dir))
+    try:
+        run_dir_or_archive = _format_dir_or_archive_path(storage, run_path)
+        if _should_delete_run(storage, run_dir_or_archive, run_config):
+            return run_dir_or_archive
 
-    if _should_delete_run(storage, run_dir_or_archive, config):
-        if config.dry_run:
-            log.info("Would delete run directory or archive %s", run_dir_or_archive)
-        else:
-            log.info("Deleting run directory or archive %s", run_dir_or_archive)
-            storage.delete_path(run_dir_or_archive)
-    else:
         log.info("Skipping run directory or archive %s", run_dir_or_archive)
+        return None
+    finally:
+        # Delete temp dir after each run to avoid storage bloat
+        if Path(run_config.temp_dir).is_dir():
+            log.info("Deleting temp dir %s", run_config.temp_dir)
+            shutil.rmtree(run_config.temp_dir)
+
+
+def _delete_run(run_dir_or_archive: str, config: DeleteBadRunsConfig):
+    if config.dry_run:
+        log.info("Would delete run directory or archive %s", run_dir_or_archive)
+    else:
+        log.info("Deleting run directory or archive %s", run_dir_or_archive)
+        storage: StorageAdapter = _get_storage_adapter_for_path(run_dir_or_archive)
+        storage.delete_path(run_dir_or_archive)
+
+
+def _get_results_or_cancel(executor: ThreadPoolExecutor, futures: List[Future]) -> List[Any]:
+    try:
+        return [future.result() for future in futures]
+    except Exception:
+        # Work that has not started yet is cancelled, so that nothing more is done after a failure
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
 
 
 def delete_bad_runs(run_paths: List[str], config: DeleteBadRunsConfig):
-    for run_path in run_paths:
-        storage: StorageAdapter = _get_storage_adapter_for_path(run_path)
-        log.info("Starting to check if run %s should be deleted", run_path)
-        _delete_if_bad_run(storage, run_path, config)
+    # All the runs are checked before any of them is deleted, so that a failed check (e.g. of a non-run
+    # directory without --ignore_non_runs) stops the operation before anything is deleted.
+    with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
+        futures = [executor.submit(_get_bad_run_path, run_path, config) for run_path in run_paths]
+        bad_run_paths: List[Optional[str]] = _get_results_or_cancel(executor, futures)
+
+    with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
+        futures = [
+            executor.submit(_delete_run, run_dir_or_archive, config)
+            for run_dir_or_archive in bad_run_paths
+            if run_dir_or_archive is not None
+        ]
+        _get_results_or_cancel(executor, futures)
 
-        # Delete temp dir after each run to avoid storage bloat
-        if Path(config.temp_dir).is_dir():
-            log.info("Deleting temp dir %s", config.temp_dir)
-            shutil.rmtree(config.temp_dir)
 
+def _has_checkpoint_dir_name(directory: str) -> bool:
+    return CHECKPOINT_DIR_NAME_REGEX.match(Path(directory).name) is not None
 
-def _is_checkpoint_dir(directory: str) -> bool:
-    storage = _get_storage_adapter_for_path(directory)
-    return storage.is_dir(directory) and re.match(r"step\d+(-unsharded)?$", Path(directory).name) is not None
+
+def _has_sharded_checkpoint_dir_name(directory: str) -> bool:
+    return SHARDED_CHECKPOINT_DIR_NAME_REGEX.match(Path(directory).name) is not None
 
 
-def _is_sharded_checkpoint_dir(directory: str) -> bool:
-    return _is_checkpoint_dir(directory) and re.match(r"step\d+$", Path(directory).name) is not None
+def _is_checkpoint_dir(directory: str) -> bool:
+    # The name check is done first since it does not require a storage lookup
+    if not _has_checkpoint_dir_name(directory):
+        return False
+
+    storage = _get_storage_adapter_for_path(directory)
+    return storage.is_dir(directory)
 
 
 def _get_checkpoint_number(checkpoint_dir: str) -> int:
     checkpoint_dir_name = Path(checkpoint_dir).name
     checkpoint_dir_name = checkpoint_dir_name.removesuffix("-unsharded")
-    match = re.match(r"step(\d+)$", checkpoint_dir_name)
+    match = CHECKPOINT_NUMBER_REGEX.match(checkpoint_dir_name)
     if match is None:
         raise ValueError(f"Failed to find checkpoint number for dir {checkpoint_dir}")
 
@@ -790,19 +1058,20 @@ def _get_checkpoint_number(checkpoint_dir: str) -> int:
 def _get_checkpoint_dirs(run_dir: str, run_dir_storage: StorageAdapter) -> List[str]:
     run_subdir_names = run_dir_storage.list_dirs(run_dir)
     run_subdirectories = list(map(lambda dir_name: os.path.join(run_dir, dir_name), run_subdir_names))
-    return list(filter(_is_checkpoint_dir, run_subdirectories))
+    # The entries are already known to be directories, so only their names need checking
+    return list(filter(_has_checkpoint_dir_name, run_subdirectories))
 
 
 def _get_sharded_checkpoint_dirs(
-    run_dir_storage: StorageAdapter,
+    run_subdir_names: List[str],
     run_dir: str,
     run_dir_or_archive: str,
     latest_checkpoint_only: bool,
     checkpoint_num: Optional[int] = None,
 ) -> List[str]:
-    run_subdir_names = run_dir_storage.list_dirs(run_dir)
     run_subdirectories = list(map(lambda dir_name: os.path.join(run_dir, dir_name), run_subdir_names))
-    sharded_checkpoint_directories = list(filter(_is_sharded_checkpoint_dir, run_subdirectories))
+    # The entries are already known to be directories, so only their names need checking
+    sharded_checkpoint_directories = list(filter(_has_sharded_checkpoint_dir_name, run_subdirectories))
 
     if latest_checkpoint_only and checkpoint_num is not None:
         raise ValueError("Cannot set both 'latest_checkpoint_only' and 'checkpoint_num'")
@@ -856,94 +1125,165 @@ def _unshard_checkpoint(
 ):
     local_storage = LocalFileSystemAdapter()
 
-    # Download checkpoint to a temp dir if it is in cloud storage
-    if StorageAdapter.get_storage_type_for_path(sharded_checkpoint_dir) != StorageType.LOCAL_FS:
-        sharding_input_dir = local_storage.create_temp_dir(directory=unsharding_config.temp_dir)
-        src_storage = _get_storage_adapter_for_path(sharded_checkpoint_dir)
-        src_storage.download_folder(sharded_checkpoint_dir, sharding_input_dir)
-    else:
-        sharding_input_dir = sharded_checkpoint_dir
+    # The temp dirs are deleted as soon as this checkpoint is done, rather than when the adapter is garbage
+    # collected, to limit how much local disk space is used at once.
+    try:
+        # Download checkpoint to a temp dir if it is in cloud storage
+        if StorageAdapter.get_storage_type_for_path(sharded_checkpoint_dir) != StorageType.LOCAL_FS:
+            sharding_input_dir = local_storage.create_temp_dir(directory=unsharding_config.temp_dir)
+            src_storage = _get_storage_adapter_for_path(sharded_checkpoint_dir)
+            src_storage.download_folder(sharded_checkpoint_dir, sharding_input_dir)
+        else:
+            sharding_input_dir = sharded_checkpoint_dir
 
-    training_config_added = _add_training_config_to_checkpoint(sharding_input_dir, run_dir)
+        training_config_added = _add_training_config_to_checkpoint(sharding_input_dir, run_dir)
 
-    # Set unsharder output to a temp dir
-    sharding_output_dir: str
-    sharding_output_dir = local_storage.create_temp_dir(directory=unsharding_config.temp_dir)
+        # Set unsharder output to a temp dir
+        sharding_output_dir: str
+        sharding_output_dir = local_storage.create_temp_dir(directory=unsharding_config.temp_dir)
 
-    try:
-        # `TrainConfig` is not backwards-compatible with all older checkpoints, so
-        # we need to load the yaml directly.
-        raw_config = om.load(str(Path(sharding_input_dir) / "config.yaml"))
-        assert isinstance(raw_config, omegaconf.DictConfig)
-
-        sharded_checkpoint_type_str = raw_config.get("sharded_checkpointer", "torch_legacy")
-        if sharded_checkpoint_type_str == "legacy":
-            # At some point, the enum string for ShardedCheckpointerType.torch_legacy was "legacy"
-            sharded_checkpoint_type_str = "torch_legacy"
-
-        sharded_checkpoint_type = ShardedCheckpointerType[sharded_checkpoint_type_str]
-
-        # The ShardedCheckpointers require a `TrainConfig` to be passed in, but
-        # legacy configs are not all compatible with this class. None of the config
-        # settings are needed for unsharding, so we pass in a dummy config instead.
-        # This is a hack, but decoupling unsharding for checkpoint saving/loading
-        # seems like overkill.
-        dummy_config = TrainConfig.new()
-        checkpointer: Checkpointer
-        if sharded_checkpoint_type == ShardedCheckpointerType.torch_legacy:
-            checkpointer = TorchLegacyShardedCheckpointer(dummy_config)
-        elif sharded_checkpoint_type == ShardedCheckpointerType.local:
-            checkpointer = LocalShardedCheckpointer(dummy_config)
-        else:
-            raise NotImplementedError(sharded_checkpoint_type)
+        try:
+            # `TrainConfig` is not backwards-compatible with all older checkpoints, so
+            # we need to load the yaml directly.
+            raw_config = om.load(str(Path(sharding_input_dir) / "config.yaml"))
+            assert isinstance(raw_config, omegaconf.DictConfig)
+
+            sharded_checkpoint_type_str = raw_config.get("sharded_checkpointer", "torch_legacy")
+            if sharded_checkpoint_type_str == "legacy":
+                # At some point, the enum string for ShardedCheckpointerType.torch_legacy was "legacy"
+                sharded_checkpoint_type_str = "torch_legacy"
+
+            sharded_checkpoint_type = ShardedCheckpointerType[sharded_checkpoint_type_str]
+
+            # The ShardedCheckpointers require a `TrainConfig` to be passed in, but
+            # legacy configs are not all compatible with this class. None of the config
+            # settings are needed for unsharding, so we pass in a dummy config instead.
+            # This is a hack, but decoupling unsharding for checkpoint saving/loading
+            # seems like overkill.
+            dummy_config = TrainConfig.new()
+            checkpointer: Checkpointer
+            if sharded_checkpoint_type == ShardedCheckpointerType.torch_legacy:
+                checkpointer = TorchLegacyShardedCheckpointer(dummy_config)
+            elif sharded_checkpoint_type == ShardedCheckpointerType.local:
+                checkpointer = LocalShardedCheckpointer(dummy_config)
+            else:
+                raise NotImplementedError(sharded_checkpoint_type)
 
-        model_state_dict, optim_state_dict, trainer_state_dict = checkpointer.unshard_checkpoint(
-            sharding_input_dir
-        )
-    except RuntimeError as e:
-        log.error(
-            "Unsharding from %s to %s failed with exception: %s",
+            model_state_dict, optim_state_dict, trainer_state_dict = checkpointer.unshard_checkpoint(
+                sharding_input_dir
+            )
+        except RuntimeError as e:
+            log.error(
+                "Unsharding from %s to %s failed with exception: %s",
+                sharding_input_dir,
+                sharding_output_dir,
+                e,
+            )
+
+            if training_config_added:
+                local_storage.delete_path(str(Path(sharding_input_dir) / CONFIG_YAML))
+
+            return
+
+        dest_storage = _get_storage_adapter_for_path(dest_dir)
+
+        try:
+            # Each output file is uploaded as soon as it is saved, so that uploads overlap with saving the rest.
+            with ThreadPoolExecutor(max_workers=1) as upload_executor:
+                upload_futures: List[Future] = []
+
+                def upload_output(output_path: str):
+                    log.info("Uploading %s to %s", output_path, dest_dir)
+                    upload_futures.append(
+                        upload_executor.submit(
+                            dest_storage.upload, output_path, os.path.join(dest_dir, Path(output_path).name)
+                        )
+                    )
+
+                def raise_failed_upload_errors():
+                    # Saving the remaining (multi-GB) state is pointless once an upload has failed
+                    for future in upload_futures:
+                        if future.done():
+                            future.result()
+
+                # model
+                model_output = str(Path(sharding_output_dir) / "model.pt")
+                log.info("Saving model state to %s", model_output)
+                torch.save(model_state_dict, model_output)
+                del model_state_dict
+                upload_output(model_output)
+                raise_failed_upload_errors()
+
+                # optimizer
+                optim_output = str(Path(sharding_output_dir) / "optim.pt")
+                log.info("Saving optimizer state to %s", optim_output)
+                torch.save(optim_state_dict, optim_output)
+                del optim_state_dict
+                upload_output(optim_output)
+                raise_failed_upload_errors()
+
+                # trainer
+                train_output = str(Path(sharding_output_dir) / "train.pt")
+                log.info("Saving everything else to %s", train_output)
+                torch.save(trainer_state_dict, train_output)
+                del trainer_state_dict
+                upload_output(train_output)
+                raise_failed_upload_errors()
+
+                log.info("Copying config.yaml to %s", sharding_output_dir)
+                config_output = shutil.copy(Path(sharding_input_dir) / "config.yaml", sharding_output_dir)
+                upload_output(str(config_output))
+
+                for future in upload_futures:
+                    future.result()
+        except Exception:
+            # The files uploaded so far are deleted, since the destination directory existing is
+            # taken to mean that the checkpoint has already been unsharded.
+            log.error("Failed to save or upload unsharded checkpoint, deleting partial upload at %s", dest_dir)
+            dest_storage.delete_path(os.path.join(dest_dir, ""))
+            raise
+
+        log.info(
+            "Successfully unsharded from %s to %s and uploaded to %s",
             sharding_input_dir,
             sharding_output_dir,
-            e,
+            dest_dir,
         )
+    finally:
+        local_storage.delete_temp_files()
 
-        if training_config_added:
-            local_storage.delete_path(str(Path(sharding_input_dir) / CONFIG_YAML))
-
-        local_storage.delete_path(sharding_output_dir)
-        return
-
-    # model
-    model_output = str(Path(sharding_output_dir) / "model.pt")
-    log.info("Saving model state to %s", model_output)
-    torch.save(model_state_dict, model_output)
-    del model_state_dict
 
-    # optimizer
-    optim_output = str(Path(sharding_output_dir) / "optim.pt")
-    log.info("Saving optimizer state to %s", optim_output)
-    torch.save(optim_state_dict, optim_output)
-    del optim_state_dict
+def _unshard_run_checkpoint(
+    run_dir_storage: StorageAdapter,
+    run_dir: str,
+    sharded_checkpoint_directory: str,
+    dest_directory: str,
+    config: UnshardCheckpointsConfig,
+):
+    if config.dry_run:
+        log.info("Would unshard sharded checkpoint %s to %s", sharded_checkpoint_directory, dest_directory)
+    else:
+        log.info("Unsharding sharded checkpoint %s to %s", sharded_checkpoint_directory, dest_directory)
+        _unshard_checkpoint(sharded_checkpoint_directory, dest_directory, run_dir, config)
 
-    # trainer
-    train_output = str(Path(sharding_output_dir) / "train.pt")
-    log.info("Saving everything else to %s", train_output)
-    torch.save(trainer_state_dict, train_output)
-    del trainer_state_dict
+    if config.delete_sharded_checkpoints:
+        if config.dry_run:
+            log.info("Would delete sharded checkpoint %s", sharded_checkpoint_directory)
+        else:
+            log.info("Deleting sharded checkpoint %s", sharded_checkpoint_directory)
+            run_dir_storage.delete_path(sharded_checkpoint_directory)
 
-    log.info("Copying config.yaml to %s", sharding_output_dir)
-    shutil.copy(Path(sharding_input_dir) / "config.yaml", sharding_output_dir)
 
-    log.info(
-        "Successfully unsharded from %s to %s, starting upload to %s",
-        sharding_input_dir,
-        sharding_output_dir,
-        dest_dir,
-    )
+def _list_dir_names(storage: StorageAdapter, directory: str) -> Set[str]:
+    # Cloud storage adapters need the trailing slash to list the contents of the directory,
+    # and list directories with a trailing slash
+    try:
+        dir_names = storage.list_dirs(os.path.join(directory, ""))
+    except ValueError:
+        # The directory does not exist (yet)
+        return set()
 
-    dest_storage = _get_storage_adapter_for_path(dest_dir)
-    dest_storage.upload(sharding_output_dir, dest_dir)
+    return {dir_name.rstrip("/") for dir_name in dir_names}
 
 
 def _unshard_checkpoints(
@@ -960,16 +1300,28 @@ def _unshard_checkpoints(
     run_dir = _unarchive_if_archive(run_dir_or_archive, run_storage)
     run_dir_storage = _get_storage_adapter_for_path(run_dir)
 
+    if config.delete_sharded_checkpoints:
+        assert run_dir == run_dir_or_archive
+
+    run_subdir_names = run_dir_storage.list_dirs(run_dir)
     sharded_checkpoint_directories = _get_sharded_checkpoint_dirs(
-        run_dir_storage, run_dir, run_dir_or_archive, config.latest_checkpoint_only, config.checkpoint_num
+        run_subdir_names, run_dir, run_dir_or_archive, config.latest_checkpoint_only, config.checkpoint_num
     )
+
+    # The existing unsharded directories are found from one listing per side, rather than checking for each
+    # checkpoint separately, to save a round-trip per check when the directories are in cloud storage.
+    # Cloud storage adapters list directories with a trailing slash.
+    dirs_in_source = {dir_name.rstrip("/") for dir_name in run_subdir_names}
+    dest_storage = _get_storage_adapter_for_path(checkpoints_dest_dir)
+    dirs_in_dest = _list_dir_names(dest_storage, checkpoints_dest_dir)
+
+    sharded_and_dest_directories: List[Tuple[str, str]] = []
     for sharded_checkpoint_directory in sharded_checkpoint_directories:
         sharded_checkpoint_dir_name = Path(sharded_checkpoint_directory).name
+        unsharded_checkpoint_dir_name = f"{sharded_checkpoint_dir_name}-unsharded"
 
-        unsharded_checkpoint_directory_in_source = os.path.join(
-            run_dir, f"{sharded_checkpoint_dir_name}-unsharded"
-        )
-        if run_dir_storage.is_dir(unsharded_checkpoint_directory_in_source):
+        unsharded_checkpoint_directory_in_source = os.path.join(run_dir, unsharded_checkpoint_dir_name)
+        if unsharded_checkpoint_dir_name in dirs_in_source:
             log.info(
                 "Unsharded directory already exists for %s at source %s, skipping",
                 sharded_checkpoint_dir_name,
@@ -977,9 +1329,8 @@ def _unshard_checkpoints(
             )
             continue
 
-        dest_directory = os.path.join(checkpoints_dest_dir, f"{sharded_checkpoint_dir_name}-unsharded")
-        dest_storage = _get_storage_adapter_for_path(dest_directory)
-        if dest_storage.is_dir(dest_directory):
+        dest_directory = os.path.join(checkpoints_dest_dir, unsharded_checkpoint_dir_name)
+        if unsharded_checkpoint_dir_name in dirs_in_dest:
             log.info(
                 "Unsharded directory already exists for %s at destination %s, skipping",
                 sharded_checkpoint_dir_name,
@@ -987,19 +1338,23 @@ def _unshard_checkpoints(
             )
             continue
 
-        if config.dry_run:
-            log.info("Would unshard sharded checkpoint %s to %s", sharded_checkpoint_directory, dest_directory)
-        else:
-            log.info("Unsharding sharded checkpoint %s to %s", sharded_checkpoint_directory, dest_directory)
-            _unshard_checkpoint(sharded_checkpoint_directory, dest_directory, run_dir, config)
+        sharded_and_dest_directories.append((sharded_checkpoint_directory, dest_directory))
 
-        if config.delete_sharded_checkpoints:
-            assert run_dir == run_dir_or_archive
-            if config.dry_run:
-                log.info("Would delete sharded checkpoint %s", sharded_checkpoint_directory)
-            else:
-                log.info("Deleting sharded checkpoint %s", sharded_checkpoint_directory)
-                run_dir_storage.delete_path(sharded_checkpoint_directory)
+    # Checkpoints are unsharded concurrently since much of the time of each is spent transferring data
+    with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
+        futures = [
+            executor.submit(
+                _unshard_run_checkpoint,
+                run_dir_storage,
+                run_dir,
+                sharded_checkpoint_directory,
+                dest_directory,
+                config,
+            )
+            for sharded_checkpoint_directory, dest_directory in sharded_and_dest_directories
+        ]
+        for future in futures:
+            future.result()
 
 
 def unshard_run_checkpoints(run_path: str, checkpoints_dest_dir: str, config: UnshardCheckpointsConfig):
@@ -1026,9 +1381,18 @@ def _get_wandb_runs_from_wandb_dir(storage: StorageAdapter, wandb_dir: str, run_
 
     log.debug("Wandb ids: %s", wandb_ids)
 
+    if len(wandb_ids) == 0:
+        return []
+
     assert run_config.wandb is not None
     api: wandb.Api = wandb.Api()
-    return [api.run(path=f"{run_config.wandb.entity}/{run_config.wandb.project}/{id}") for id in wandb_ids]
+    # Fetch all the runs in one query. The `name` field of a wandb run is its id.
+    return list(
+        api.runs(
+            path=f"{run_config.wandb.entity}/{run_config.wandb.project}",
+            filters={"name": {"$in": wandb_ids}},
+        )
+    )
 
 
 def _get_wandb_path_from_run(wandb_run) -> str:
@@ -1131,14 +1495,14 @@ def _copy(src_path: str, dest_path: str, temp_dir: str):
         # moving an entry within the same storage.
         log.warning("Moving files and directories within the same storage system has not yet been optimized")
 
-    src_storage = StorageAdapter.create_storage_adapter(src_storage_type)
+    src_storage = _get_storage_adapter(src_storage_type)
     src_is_file = src_storage.is_file(src_path)
     src_is_dir = src_storage.is_dir(src_path)
     assert not (src_is_file and src_is_dir), f"Source {src_path} is both a file and a directory"
     if not src_is_file and not src_is_dir:
         raise ValueError(f"Source {src_path} of copy operation is not a file or a directory")
 
-    dest_storage = StorageAdapter.create_storage_adapter(dest_storage_type)
+    dest_storage = _get_storage_adapter(dest_storage_type)
     if src_is_dir and dest_storage.is_file(dest_path):
         raise ValueError(f"Source path {src_path} is a directory but the destination {dest_path} is a file.")
     if src_is_file and (dest_path.endswith("/") or dest_storage.is_dir(dest_path)):
@@ -1192,7 +1556,12 @@ def _get_src_dest_pairs_for_copy(
     checkpoint_dirs = _get_checkpoint_dirs(run_dir, run_dir_storage)
     # TODO: Update _get_wandb_path to get the wandb path for a checkpoint rather than a run directory.
     # A run directory could correspond to multiple wandb runs.
-    checkpoint_to_wandb_path = {checkpoint_dir: _get_wandb_path(run_dir) for checkpoint_dir in checkpoint_dirs}
+    # Looking up the wandb path involves several wandb API calls, so we do it once for the run directory
+    # rather than once per checkpoint.
+    checkpoint_to_wandb_path: Dict[str, str] = {}
+    if len(checkpoint_dirs) > 0:
+        run_wandb_path = _get_wandb_path(run_dir)
+        checkpoint_to_wandb_path = {checkpoint_dir: run_wandb_path for checkpoint_dir in checkpoint_dirs}
 
     src_dest_pairs: List[Tuple[str, str]] = []
     # Mappings of source checkpoint directories to destination checkpoint directories
@@ -1310,7 +1679,8 @@ def perform_operation(args: argparse.Namespace):
                 temp_dir=temp_dir,
                 should_check_is_run=args.should_check_is_run,
                 ignore_non_runs=args.ignore_non_runs,
-                max_archive_size=int(args.max_archive_size),
+                max_archive_size=args.max_archive_size,
+                max_workers=args.max_workers,
             )
             if args.run_paths is not None:
                 delete_bad_runs(args.run_paths, delete_bad_runs_config)
@@ -1323,6 +1693,7 @@ def perform_operation(args: argparse.Namespace):
                 latest_checkpoint_only=args.latest_checkpoint_only,
                 delete_sharded_checkpoints=args.delete_sharded_checkpoints,
                 checkpoint_num=args.checkpoint_num,
+                max_workers=args.max_workers,
             )
             if args.run_path is not None:
                 unshard_run_checkpoints(args.run_path, args.dest_dir, unshard_checkpoints_config)
@@ -1375,10 +1746,17 @@ def _add_delete_subparser(subparsers: _SubParsersAction):
 
     delete_runs_parser.add_argument(
         "--max_archive_size",
-        type=float,
+        type=int,
         default=DEFAULT_DELETE_MAX_ARCHIVE_SIZE,
         help="Max size archive files to consider for deletion (in bytes). Any archive larger than this is ignored/not deleted.",
     )
+    delete_runs_parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=DEFAULT_DELETE_MAX_WORKERS,
+        help="Max number of runs to check (and delete) concurrently. Each run being checked may download and "
+        "extract an archive of up to --max_archive_size into the temp dir.",
+    )
 
 
 def _add_unsharding_subparser(subparsers: _SubParsersAction):
@@ -1410,6 +1788,12 @@ def _add_unsharding_subparser(subparsers: _SubParsersAction):
         default=None,
         help="If provided, unsharding is restricted to this checkpoint of the run.",
     )
+    unsharding_runs_parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=DEFAULT_UNSHARD_MAX_WORKERS,
+        help="Max number of checkpoints to unshard concurrently. Each unsharding holds a full checkpoint in memory.",
+    )
 
 
 def _add_move_subparser(subparsers: _SubParsersAction):
@@ -1452,7 +1836,9 @@ def get_parser() -> ArgumentParser:
     )
     parser.add_argument(
         "--temp_dir",
-        help="Local directory where artifacts (e.g. unarchived directories) can be stored temporarily",
+        help="Local directory where artifacts (e.g. unarchived directories) can be stored temporarily. "
+        "A memory-backed directory (e.g. one in /dev/shm) with enough space avoids staging unsharded "
+        "checkpoints on slow local disks.",
     )
 
     subparsers = parser.add_subparsers(dest="command", help="Cleaning commands", required=True)
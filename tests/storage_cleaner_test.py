@@ -0,0 +1,133 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import botocore.exceptions as boto_exceptions
+import pytest
+import torch
+
+from scripts.storage_cleaner import (
+    DeleteBadRunsConfig,
+    LocalFileSystemAdapter,
+    S3StorageAdapter,
+    StorageType,
+    UnshardCheckpointsConfig,
+    _unshard_checkpoint,
+    delete_bad_runs,
+)
+
+
+def _make_s3_client(keys):
+    s3_client = MagicMock()
+
+    def head_object(Bucket, Key):
+        raise boto_exceptions.ClientError({"Error": {"Code": "404"}}, "HeadObject")
+
+    def list_objects_v2(Bucket, Prefix, MaxKeys):
+        return {"Contents": [{"Key": key} for key in keys if key.startswith(Prefix)][:MaxKeys]}
+
+    def paginate(Bucket, Prefix, **kwargs):
+        return [{"Contents": [{"Key": key, "Size": 1} for key in keys if key.startswith(Prefix)]}]
+
+    def download_file(bucket_name, key, local_filepath, Config=None):
+        # Slow enough for concurrent downloads of different folders to overlap
+        time.sleep(0.1)
+        Path(local_filepath).write_text(key)
+
+    s3_client.head_object.side_effect = head_object
+    s3_client.list_objects_v2.side_effect = list_objects_v2
+    s3_client.get_paginator.return_value.paginate.side_effect = paginate
+    s3_client.download_file.side_effect = download_file
+    return s3_client
+
+
+def test_s3_download_folders_concurrently(tmp_path):
+    keys = [f"run/step{step}/shard{shard}.pt" for step in range(2) for shard in range(4)]
+    storage = S3StorageAdapter(StorageType.S3)
+    storage._s3_client = _make_s3_client(keys)
+
+    # Folders are downloaded concurrently when unsharding with more than 1 worker
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(storage.download_folder, f"s3://bucket/run/step{step}/", tmp_path / f"step{step}")
+            for step in range(2)
+        ]
+        for future in futures:
+            future.result()
+
+    for key in keys:
+        local_path = tmp_path / key.removeprefix("run/")
+        assert local_path.read_text() == key
+
+
+def test_local_download_folder_copies_dir_metadata(tmp_path):
+    src_dir = tmp_path / "src"
+    (src_dir / "sub").mkdir(parents=True)
+    for i in range(20):
+        (src_dir / "sub" / f"file{i}").write_text(str(i))
+    os.utime(src_dir / "sub", (1_000_000, 1_000_000))
+
+    LocalFileSystemAdapter().download_folder(str(src_dir), tmp_path / "dest")
+
+    for i in range(20):
+        assert (tmp_path / "dest" / "sub" / f"file{i}").read_text() == str(i)
+    # Directory metadata is copied after the files, which would otherwise update the modification time
+    assert (tmp_path / "dest" / "sub").stat().st_mtime == 1_000_000
+
+
+def test_delete_bad_runs_deletes_nothing_if_a_check_fails(tmp_path):
+    (tmp_path / "runA" / "step0").mkdir(parents=True)
+    (tmp_path / "not_a_run").mkdir()
+    (tmp_path / "not_a_run" / "file").write_text("")
+    temp_dir = tmp_path / "temp"
+    temp_dir.mkdir()
+
+    config = DeleteBadRunsConfig(
+        dry_run=False,
+        temp_dir=str(temp_dir),
+        should_check_is_run=True,
+        ignore_non_runs=False,
+        max_archive_size=None,
+        max_workers=2,
+    )
+    with pytest.raises(ValueError):
+        delete_bad_runs([str(tmp_path / "runA"), str(tmp_path / "not_a_run")], config)
+
+    assert (tmp_path / "runA").is_dir()
+    assert (tmp_path / "not_a_run").is_dir()
+
+
+def test_unshard_checkpoint_deletes_partial_upload_on_failure(tmp_path):
+    sharded_checkpoint_dir = tmp_path / "run" / "step1"
+    sharded_checkpoint_dir.mkdir(parents=True)
+    (sharded_checkpoint_dir / "config.yaml").write_text("sharded_checkpointer: torch_legacy\n")
+    dest_dir = tmp_path / "dest" / "step1-unsharded"
+    temp_dir = tmp_path / "temp"
+    temp_dir.mkdir()
+
+    original_upload = LocalFileSystemAdapter.upload
+
+    def upload(self, local_src, dest_path):
+        # Only the first file (the model) gets uploaded successfully
+        if Path(local_src).name != "model.pt":
+            raise OSError("Upload failed")
+        original_upload(self, local_src, dest_path)
+
+    config = UnshardCheckpointsConfig(
+        dry_run=False,
+        temp_dir=str(temp_dir),
+        latest_checkpoint_only=False,
+        delete_sharded_checkpoints=False,
+        checkpoint_num=None,
+        max_workers=1,
+    )
+    with patch("scripts.storage_cleaner.TorchLegacyShardedCheckpointer") as checkpointer_class, patch.object(
+        LocalFileSystemAdapter, "upload", upload
+    ):
+        checkpointer_class.return_value.unshard_checkpoint.return_value = ({"weight": torch.zeros(2)}, {}, {})
+        with pytest.raises(OSError, match="Upload failed"):
+            _unshard_checkpoint(str(sharded_checkpoint_dir), str(dest_dir), str(tmp_path / "run"), config)
+
+    assert not dest_dir.exists()